@@ -0,0 +1,103 @@
+"""
+Compare reading TRCK/TPOS/TPE1/TALB via mutagen.File vs. booktool.audio.id3
+on MP3s with large embedded cover art, reporting bytes read and peak memory.
+
+    python benchmarks/bench_id3.py [--cover-size BYTES] [--tracks N]
+"""
+from typing import Callable, Tuple
+import argparse
+import builtins
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import mutagen
+from mutagen.id3 import APIC, ID3, TALB, TPE1, TPOS, TRCK
+
+# import booktool from this checkout, even if it isn't installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from booktool.audio.id3 import read_text_frames  # noqa: E402
+
+FRAME_IDS = ("TRCK", "TPOS", "TPE1", "TALB")
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz frame (417 bytes) of silence
+MPEG_FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+
+
+_open = builtins.open
+
+
+class CountingFile(io.FileIO):
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        CountingFile.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        CountingFile.bytes_read += count or 0
+        return count
+
+
+def counting_open(file, mode="r", *args, **kwargs):
+    if mode == "rb" and not args and not kwargs:
+        return CountingFile(file, "r")
+    return _open(file, mode, *args, **kwargs)
+
+
+def write_mp3(path: str, cover_size: int):
+    with open(path, "wb") as fileobj:
+        fileobj.write(MPEG_FRAME * 100)
+    tags = ID3()
+    tags.add(APIC(encoding=3, mime="image/jpeg", type=3, data=os.urandom(cover_size)))
+    tags.add(TPE1(encoding=3, text="Author"))
+    tags.add(TALB(encoding=3, text="Title"))
+    tags.add(TPOS(encoding=0, text="1/1"))
+    tags.add(TRCK(encoding=0, text="1/10"))
+    tags.save(path, v2_version=3)
+
+
+def measure(read: Callable[[str], object], paths) -> Tuple[int, int, float]:
+    CountingFile.bytes_read = 0
+    builtins.open = counting_open
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        for path in paths:
+            read(path)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        builtins.open = _open
+    return CountingFile.bytes_read, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cover-size", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--tracks", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"{i:02}.mp3") for i in range(args.tracks)]
+        for path in paths:
+            write_mp3(path, args.cover_size)
+
+        readers = [
+            ("mutagen.File", mutagen.File),
+            ("read_text_frames", lambda path: read_text_frames(path, FRAME_IDS)),
+        ]
+        print(f"{args.tracks} tracks with {args.cover_size:,} byte cover art")
+        print(f"{'reader':<18} {'bytes read':>14} {'peak memory':>14} {'seconds':>9}")
+        for name, read in readers:
+            bytes_read, peak, elapsed = measure(read, paths)
+            print(f"{name:<18} {bytes_read:>14,} {peak:>14,} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
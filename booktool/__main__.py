@@ -1,8 +1,9 @@
 """
 Booktool CLI
 """
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 from itertools import groupby
+import json
 import logging
 import os
 
@@ -14,17 +15,75 @@ import booktool
 from booktool.audio import find_audio
 from booktool.audio.group import flatten_discs
 from booktool.audio.track import (
+    ConflictError,
     get_album,
     get_artist,
     get_duration,
     get_track,
     set_track,
 )
+from booktool.shard import Shard, merge_reports, new_report
 from booktool.util import sanitize
 
 logger = logging.getLogger(booktool.__name__)
 
 
+def parse_shard(ctx, param, value: str) -> Shard:
+    try:
+        return Shard.from_string(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc)) from exc
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]):
+    if path:
+        logger.debug("Writing shard %s report to %r", report["shard"], path)
+        with open(path, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+
+def group_key(path: str) -> Tuple[str, str]:
+    return get_artist(path), get_album(path)
+
+
+def shard_key(path: str) -> Tuple[str, ...]:
+    """
+    Like group_key, but fall back to the file's directory if it has no
+    (readable) artist/album, so that sharding works on any audio file.
+    """
+    try:
+        return group_key(path)
+    except (
+        AttributeError,
+        NotImplementedError,
+        StopIteration,
+        TypeError,
+        ValueError,
+    ) as exc:
+        logger.warning(
+            "Sharding %r by directory; cannot read artist/album: %r", path, exc
+        )
+        return (os.path.dirname(path),)
+
+
+shard_option = click.option(
+    "--shard",
+    callback=parse_shard,
+    default="1/1",
+    show_default=True,
+    help="Only process the i-th of N partitions (by artist & album) of the files",
+)
+
+
+def report_option(help_text: str):
+    return click.option(
+        "-r",
+        "--report",
+        type=click.Path(dir_okay=False, writable=True),
+        help=help_text,
+    )
+
+
 @click.group(help=__doc__)
 @click.version_option(booktool.__version__)
 @click.option("-v", "--verbose", count=True, help="Increase logging verbosity")
@@ -50,14 +109,29 @@ def cli(verbose: int):
     is_flag=True,
     help="Ignore conflicts in existing metadata",
 )
+@click.option(
+    "-s",
+    "--skip-conflicts",
+    is_flag=True,
+    help="Skip (and report) tracks with conflicts in existing metadata, "
+    "instead of aborting",
+)
 @click.option(
     "-n",
     "--dry-run",
     is_flag=True,
     help="Don't actually do anything, just log any changes that would be made",
 )
+@shard_option
+@report_option("Write JSON report (moves, conflicts) to this file")
 def canonicalize(
-    paths: List[str], destination: str, ignore_conflicts: bool, dry_run: bool
+    paths: List[str],
+    destination: str,
+    ignore_conflicts: bool,
+    skip_conflicts: bool,
+    dry_run: bool,
+    shard: Shard,
+    report: Optional[str],
 ):
     """
     Rearrange audio files into canonical structure.
@@ -66,14 +140,21 @@ def canonicalize(
     2. fix file permissions
     3. fix track numbers
     """
+    shard_report = new_report(shard)
 
-    def path_key(path: str) -> Tuple[str, str]:
-        return get_artist(path), get_album(path)
+    def record_move(source: str, target: str):
+        if os.path.realpath(source) != os.path.realpath(target):
+            shard_report["moves"].append([source, target])
 
-    audio_paths = sorted(find_audio(*paths), key=path_key)
+    audio_paths = sorted(find_audio(*paths), key=group_key)
 
-    for (artist, album), group_paths in groupby(audio_paths, key=path_key):
+    for (artist, album), group_paths in groupby(audio_paths, key=group_key):
+        if not shard.contains((artist, album)):
+            continue
         group_paths = sorted(group_paths)
+        # where each path would be after moving its directory, which is
+        # different from where it is if dry_run is set
+        planned_paths: Dict[str, str] = {}
 
         # if all paths in a group are the only audio files in that directory,
         # move the entire directory
@@ -88,17 +169,29 @@ def canonicalize(
             new_commonpath = os.path.join(
                 destination, sanitize(artist), sanitize(album)
             )
+            record_move(commonpath, new_commonpath)
             commonpath = move(commonpath, new_commonpath, dry_run=dry_run)
             group_paths = [
                 os.path.join(commonpath, relpath) for relpath in group_relpaths
             ]
+            planned_paths = {
+                path: os.path.join(new_commonpath, relpath)
+                for path, relpath in zip(group_paths, group_relpaths)
+            }
 
         flatten_discs(group_paths)
 
         for path in group_paths:
             logger.debug("Canonicalizing %r", path)
             _, ext = os.path.splitext(os.path.basename(path))
-            track_number, total_tracks = get_track(path, ignore_conflicts)
+            try:
+                track_number, total_tracks = get_track(path, ignore_conflicts)
+            except ConflictError as exc:
+                if not skip_conflicts:
+                    raise
+                logger.warning("Skipping %r: %s", path, exc)
+                shard_report["conflicts"].append([path, str(exc)])
+                continue
             part_width = len(str(total_tracks))
 
             new_filepath = os.path.join(
@@ -109,6 +202,7 @@ def canonicalize(
             )
 
             # move to destination
+            record_move(planned_paths.get(path, path), new_filepath)
             path = move(path, new_filepath, dry_run=dry_run)
             # fix permissions on files
             chmod(path, 0o644, dry_run=dry_run)
@@ -116,18 +210,48 @@ def canonicalize(
             set_track(path, (track_number, total_tracks), dry_run=dry_run)
             # ignore xattrs; they're dropped when syncing to cloud storage anyway
 
+    write_report(shard_report, report)
+
 
 @cli.command()
 @click.argument("paths", type=click.Path(exists=True), nargs=-1)
-def duration(paths: List[str]):
+@shard_option
+@report_option("Write JSON report (duration) to this file")
+def duration(paths: List[str], shard: Shard, report: Optional[str]):
     """
     Sum total duration of all indicated audio files.
 
     For each directory, recursively expand to all files within.
     For each file, exclude if the name does not match known audio extensions.
     """
-    total_duration = round(sum(map(get_duration, find_audio(*paths))))
-    print(total_duration)
+    audio_paths = find_audio(*paths)
+    if shard.total > 1:
+        audio_paths = (path for path in audio_paths if shard.contains(shard_key(path)))
+    shard_report = new_report(shard)
+    shard_report["duration"] = sum(map(get_duration, audio_paths))
+    print(round(shard_report["duration"]))
+    write_report(shard_report, report)
+
+
+@cli.command(name="merge-reports")
+@click.argument("reports", type=click.File(), nargs=-1)
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="Write merged JSON report to this file",
+)
+def merge_reports_command(reports: List[TextIO], output: TextIO):
+    """
+    Combine the JSON reports written by `--shard i/N --report ...` runs.
+
+    Sums durations, concatenates moves and conflicts, and warns about any
+    missing shards.
+    """
+    merged = merge_reports(json.load(report) for report in reports)
+    json.dump(merged, output, indent=2)
+    output.write("\n")
 
 
 main = cli.main
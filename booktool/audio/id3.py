@@ -0,0 +1,169 @@
+"""
+Selective ID3v2 reader.
+
+mutagen decodes every frame in a tag, including multi-megabyte APIC cover images,
+even when all we want is a couple of short text frames. This module walks the
+frame headers directly and only reads the payloads of the requested text frames,
+seeking past everything else.
+"""
+from typing import BinaryIO, Dict, Iterable, NamedTuple, Optional
+import logging
+import struct
+
+logger = logging.getLogger(__name__)
+
+# ID3v2.2 used 3-character frame IDs; map the text frames we might ask for
+V22_FRAME_IDS = {
+    "TAL": "TALB",
+    "TCM": "TCOM",
+    "TCO": "TCON",
+    "TP1": "TPE1",
+    "TP2": "TPE2",
+    "TPA": "TPOS",
+    "TRK": "TRCK",
+    "TT2": "TIT2",
+    "TYE": "TYER",
+}
+
+ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+
+class TextFrames(NamedTuple):
+    """
+    Stand-in for mutagen.mp3.MP3 for the getters that only read text frames;
+    `tags` maps frame ID to text (multiple values joined by NUL, like mutagen).
+    """
+
+    filename: str
+    tags: Dict[str, str]
+
+
+def _syncsafe(data: bytes) -> int:
+    value = 0
+    for byte in data:
+        value = (value << 7) | (byte & 0x7F)
+    return value
+
+
+def _decode_text(payload: bytes) -> Optional[str]:
+    encoding = ENCODINGS.get(payload[0]) if payload else None
+    if encoding is None:
+        # mutagen discards such frames, so treat them as missing
+        logger.debug("Cannot decode ID3 text frame: %r", payload[:16])
+        return None
+    text = payload[1:].decode(encoding, errors="replace")
+    # each UTF-16 value starts with its own BOM, but only the first gets consumed
+    values = [value.lstrip("\ufeff") for value in text.split("\x00")]
+    # drop the (optional) trailing terminator(s)
+    while len(values) > 1 and not values[-1]:
+        values.pop()
+    return "\x00".join(values)
+
+
+def _read_frames(
+    fileobj: BinaryIO, frame_ids: Iterable[str]
+) -> Optional[Dict[str, str]]:
+    header = fileobj.read(10)
+    if len(header) < 10 or not header.startswith(b"ID3"):
+        return None
+    major, _, flags = header[3], header[4], header[5]
+    end = 10 + _syncsafe(header[6:10])
+    if major not in (2, 3, 4):
+        logger.debug("Unsupported ID3 version 2.%d", major)
+        return None
+    if flags & 0x80 and major < 4:
+        # tag-wide unsynchronisation garbles the frame headers too
+        logger.debug("Cannot selectively read unsynchronised ID3v2.%d tag", major)
+        return None
+    if flags & 0x40 and major > 2:
+        # skip extended header (v2.3 size excludes itself, v2.4 size includes itself)
+        size_bytes = fileobj.read(4)
+        if major == 3:
+            fileobj.seek(struct.unpack(">I", size_bytes)[0], 1)
+        else:
+            fileobj.seek(_syncsafe(size_bytes) - 4, 1)
+
+    requested = set(frame_ids)
+    frames: Dict[str, str] = {}
+    header_size = 6 if major == 2 else 10
+    # keep going after finding each requested frame, since frames can repeat
+    while fileobj.tell() + header_size <= end:
+        frame_header = fileobj.read(header_size)
+        if len(frame_header) < header_size or frame_header[0] == 0:
+            # reached padding (or a truncated file)
+            break
+        if major == 2:
+            frame_id = frame_header[:3].decode("latin-1")
+            frame_id = V22_FRAME_IDS.get(frame_id, frame_id)
+            size = int.from_bytes(frame_header[3:6], "big")
+            frame_flags = 0
+        else:
+            frame_id = frame_header[:4].decode("latin-1")
+            if major == 3:
+                size = struct.unpack(">I", frame_header[4:8])[0]
+            else:
+                size = _syncsafe(frame_header[4:8])
+            frame_flags = struct.unpack(">H", frame_header[8:10])[0]
+        if not frame_id.isalnum() or fileobj.tell() + size > end:
+            # e.g., v2.4 tags written with non-syncsafe frame sizes
+            logger.debug("Found invalid ID3 frame header: %r", frame_header)
+            return None
+
+        if frame_id not in requested:
+            fileobj.seek(size, 1)
+            continue
+
+        if (major == 3 and frame_flags & 0x00C0) or (
+            major == 4 and frame_flags & 0x000C
+        ):
+            logger.debug("Cannot selectively read compressed/encrypted %s", frame_id)
+            return None
+        payload = fileobj.read(size)
+        if (major == 3 and frame_flags & 0x0020) or (
+            major == 4 and frame_flags & 0x0040
+        ):
+            # group identifier byte
+            payload = payload[1:]
+        if major == 4 and frame_flags & 0x0001:
+            # data length indicator
+            payload = payload[4:]
+        if major == 4 and (frame_flags & 0x0002 or flags & 0x80):
+            payload = payload.replace(b"\xff\x00", b"\xff")
+        text = _decode_text(payload)
+        if text is not None and frame_id in frames:
+            # mutagen merges repeated text frames into one
+            frames[frame_id] += "\x00" + text
+        elif text is not None:
+            frames[frame_id] = text
+    missing = requested - set(frames)
+    if missing and _has_id3v1(fileobj):
+        # mutagen fills in frames missing from the ID3v2 tag from the ID3v1 tag
+        logger.debug("Missing %s from ID3v2 tag, but found ID3v1 tag", missing)
+        return None
+    return frames
+
+
+def _has_id3v1(fileobj: BinaryIO) -> bool:
+    # like mutagen, look a few bytes further back, in case the tag is short
+    fileobj.seek(0, 2)
+    fileobj.seek(max(fileobj.tell() - 131, 0))
+    return b"TAG" in fileobj.read()
+
+
+def read_text_frames(path: str, frame_ids: Iterable[str]) -> Optional[TextFrames]:
+    """
+    Read only the ID3v2 text frames named in `frame_ids` from the file at `path`,
+    seeking past the payloads of all other frames (e.g., APIC cover art).
+    Requested frames that are missing from the tag (or cannot be decoded)
+    are missing from the result; repeated frames are joined by NUL.
+
+    Return None if the file has no ID3v2 tag, if the tag uses features
+    (ID3v2.2/2.3 tag-wide unsynchronisation, compressed or encrypted frames) that
+    require decoding more than the requested frames, or if requested frames are
+    missing but the file also has an ID3v1 tag; callers should fall back to mutagen.
+    """
+    with open(path, "rb") as fileobj:
+        frames = _read_frames(fileobj, frame_ids)
+    if frames is None:
+        return None
+    return TextFrames(path, frames)
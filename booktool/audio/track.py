@@ -9,10 +9,17 @@ import mutagen.mp3
 import mutagen.mp4
 
 from booktool.audio import is_audio
+from booktool.audio.id3 import TextFrames, read_text_frames
 
 logger = logging.getLogger(__name__)
 
 
+class ConflictError(ValueError):
+    """
+    Raised when metadata and filesystem disagree about a Part.
+    """
+
+
 class Part(NamedTuple):
     index: Optional[int] = None
     total: Optional[int] = None
@@ -45,16 +52,29 @@ class Part(NamedTuple):
         # check for conflicts
         if raise_on_conflicts:
             if other.index and index != other.index:
-                raise ValueError(
+                raise ConflictError(
                     f"Cannot merge with conflicts (index): {index} ≠ {other.index}"
                 )
             if other.total and total != other.total:
-                raise ValueError(
+                raise ConflictError(
                     f"Cannot merge with conflicts (total): {total} ≠ {other.total}"
                 )
         return Part(index, total)
 
 
+def open_tags(file: str, *frame_ids: str):
+    """
+    Open `file` for reading the ID3 text frames `frame_ids`.
+    MP3s are read selectively (see booktool.audio.id3) when possible,
+    otherwise (and for all other formats) fall back to mutagen.File.
+    """
+    if file.lower().endswith(".mp3"):
+        frames = read_text_frames(file, frame_ids)
+        if frames is not None:
+            return frames
+    return mutagen.File(file)
+
+
 ###########################
 # get_track dispatch
 
@@ -65,17 +85,18 @@ def get_track(file, ignore_conflicts: bool = False) -> Part:
     Read tuple of (index, total) from file.
     1. Read it from the metadata
     2. Infer it from filesystem (filename and other audio files in directory)
-    Unless ignore_conflicts is True, raise a ValueError if these two sources conflict.
+    Unless ignore_conflicts is True, raise a ConflictError if these two sources conflict.
     """
     raise NotImplementedError(f"get_track not implemented for file: {file}")
 
 
 @get_track.register
 def get_track_str(file: str, ignore_conflicts: bool = False) -> Part:
-    file = mutagen.File(file)
+    file = open_tags(file, "TRCK")
     return get_track(file, ignore_conflicts)
 
 
+@get_track.register(TextFrames)
 @get_track.register
 def get_track_mp3(file: mutagen.mp3.MP3, ignore_conflicts: bool = False) -> Part:
     logger.debug("Opened %r as MP3", file.filename)
@@ -187,10 +208,11 @@ def get_disc(file) -> Part:
 
 @get_disc.register
 def get_disc_str(file: str) -> Part:
-    file = mutagen.File(file)
+    file = open_tags(file, "TPOS")
     return get_disc(file)
 
 
+@get_disc.register(TextFrames)
 @get_disc.register
 def get_disc_mp3(file: mutagen.mp3.MP3) -> Part:
     logger.debug("Opened %r as MP3", file.filename)
@@ -246,10 +268,11 @@ def get_artist(file) -> str:
 
 @get_artist.register
 def get_artist_str(file: str) -> str:
-    file = mutagen.File(file)
+    file = open_tags(file, "TPE1")
     return get_artist(file)
 
 
+@get_artist.register(TextFrames)
 @get_artist.register
 def get_artist_mp3(file: mutagen.mp3.MP3) -> str:
     logger.debug("Opened %r as MP3", file.filename)
@@ -277,10 +300,11 @@ def get_album(file) -> str:
 
 @get_album.register
 def get_album_str(file: str) -> str:
-    file = mutagen.File(file)
+    file = open_tags(file, "TALB")
     return get_album(file)
 
 
+@get_album.register(TextFrames)
 @get_album.register
 def get_album_mp3(file: mutagen.mp3.MP3) -> str:
     logger.debug("Opened %r as MP3", file.filename)
@@ -0,0 +1,70 @@
+"""
+Deterministic partitioning of work across independent processes (or machines),
+and merging of the JSON reports each of those shards writes.
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class Shard(NamedTuple):
+    index: int = 1
+    total: int = 1
+
+    @classmethod
+    def from_string(cls, string: str):
+        """
+        Parse "i/N" (1-based, like track numbers) into Shard(i, N).
+        """
+        index_string, _, total_string = string.partition("/")
+        index, total = int(index_string), int(total_string)
+        if not 1 <= index <= total:
+            raise ValueError(f"Shard index must be in 1...{total}: {string}")
+        return cls(index, total)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.total}"
+
+    def contains(self, key: Tuple[str, ...]) -> bool:
+        """
+        Check whether the group `key` (e.g., (artist, album)) belongs to this shard.
+        Uses CRC-32 rather than hash() so that every process agrees on the assignment.
+        """
+        checksum = zlib.crc32("\0".join(key).encode("utf-8"))
+        return checksum % self.total == self.index - 1
+
+
+def new_report(shard: Shard) -> Dict[str, Any]:
+    return {"shard": str(shard), "moves": [], "conflicts": []}
+
+
+def merge_reports(reports: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine shard reports into a single report, summing durations (only
+    written by `duration`, so only merged if present) and concatenating moves
+    and conflicts. Warn about missing or duplicate shards.
+    """
+    merged: Dict[str, Any] = {"shards": [], "moves": [], "conflicts": []}
+    for report in reports:
+        merged["shards"].append(report["shard"])
+        if "duration" in report:
+            merged["duration"] = merged.get("duration", 0.0) + report["duration"]
+        merged["moves"].extend(report["moves"])
+        merged["conflicts"].extend(report["conflicts"])
+
+    shards: List[Shard] = [Shard.from_string(shard) for shard in merged["shards"]]
+    totals = sorted(set(shard.total for shard in shards))
+    if len(totals) > 1:
+        logger.warning("Merging reports from different shard counts: %s", totals)
+    for total in totals:
+        indices = [shard.index for shard in shards if shard.total == total]
+        missing = sorted(set(range(1, total + 1)) - set(indices))
+        if missing:
+            logger.warning("Missing reports for shards %s of %d", missing, total)
+        duplicates = sorted(set(index for index in indices if indices.count(index) > 1))
+        if duplicates:
+            logger.warning("Duplicate reports for shards %s of %d", duplicates, total)
+    return merged
@@ -0,0 +1,161 @@
+import mutagen
+from mutagen.id3 import APIC, ID3, TALB, TPE1, TPOS, TRCK
+
+from booktool.audio.id3 import read_text_frames
+from booktool.audio.track import get_album, get_artist, get_disc, get_track
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz frame (417 bytes) of silence
+MPEG_FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+
+
+def write_mp3(path, v2_version=4):
+    path.write_bytes(MPEG_FRAME * 20)
+    tags = ID3()
+    tags.add(APIC(encoding=3, mime="image/jpeg", type=3, data=b"\xff" * 100000))
+    tags.add(TPE1(encoding=1, text=["Jane Doe", "John Doe"]))
+    tags.add(TALB(encoding=3, text="Le Livre"))
+    tags.add(TPOS(encoding=0, text="2/3"))
+    tags.add(TRCK(encoding=0, text="4/10"))
+    tags.save(str(path), v2_version=v2_version)
+    return str(path)
+
+
+def test_read_text_frames(tmp_path):
+    for v2_version in (3, 4):
+        path = write_mp3(tmp_path / f"v2{v2_version}.mp3", v2_version)
+        frames = read_text_frames(path, ("TRCK", "TPE1", "TALB", "TIT2"))
+        expected = ID3(path)
+        assert frames.filename == path
+        assert set(frames.tags) == {"TRCK", "TPE1", "TALB"}
+        for frame_id, text in frames.tags.items():
+            assert text == str(expected[frame_id])
+
+
+def test_read_text_frames_untagged(tmp_path):
+    path = tmp_path / "untagged.mp3"
+    path.write_bytes(MPEG_FRAME * 20)
+    assert read_text_frames(str(path), ("TRCK",)) is None
+
+
+def test_getters(tmp_path):
+    directory = tmp_path / "book"
+    directory.mkdir()
+    path = write_mp3(directory / "04.mp3")
+    file = mutagen.File(path)
+    assert get_track(path, True) == get_track(file, True) == (4, 10)
+    assert get_disc(path) == get_disc(file) == (2, 3)
+    assert get_artist(path) == get_artist(file)
+    assert get_album(path) == get_album(file) == "Le Livre"
+
+
+def syncsafe(value, length=4):
+    return bytes((value >> (7 * i)) & 0x7F for i in reversed(range(length)))
+
+
+def frame(frame_id, payload, version=3, flags=0):
+    if version == 2:
+        return frame_id.encode() + len(payload).to_bytes(3, "big") + payload
+    size = syncsafe(len(payload)) if version == 4 else len(payload).to_bytes(4, "big")
+    return frame_id.encode() + size + flags.to_bytes(2, "big") + payload
+
+
+def write_tag(path, frames, version=3, flags=0, extended=b"", v1=b""):
+    body = extended + b"".join(frames) + b"\x00" * 64
+    header = b"ID3" + bytes([version, 0, flags]) + syncsafe(len(body))
+    path.write_bytes(header + body + MPEG_FRAME * 20 + v1)
+    return str(path)
+
+
+def assert_matches_mutagen(path, frame_ids=("TPE1", "TALB")):
+    frames = read_text_frames(path, frame_ids)
+    expected = ID3(path)
+    assert set(frames.tags) == {
+        frame_id for frame_id in frame_ids if frame_id in expected
+    }
+    for frame_id, text in frames.tags.items():
+        assert text == str(expected[frame_id])
+
+
+def assert_falls_back(path):
+    assert read_text_frames(path, ("TPE1", "TALB")) is None
+    file = mutagen.File(path)
+    assert get_artist(path) == get_artist(file)
+    assert get_album(path) == get_album(file)
+
+
+def test_v22(tmp_path):
+    frames = [
+        frame("PIC", b"\x00JPG\x03\x00" + b"\xff" * 1000, version=2),
+        frame("TP1", b"\x00Jane Doe\x00", version=2),
+        frame("TAL", b"\x01\xff\xfeL\x00e\x00", version=2),
+    ]
+    assert_matches_mutagen(write_tag(tmp_path / "v22.mp3", frames, version=2))
+
+
+def test_extended_header(tmp_path):
+    frames = [frame("TPE1", b"\x00Jane Doe"), frame("TALB", b"\x03Le Livre")]
+    extended = (6).to_bytes(4, "big") + b"\x00" * 6
+    path = write_tag(tmp_path / "v23.mp3", frames, flags=0x40, extended=extended)
+    assert_matches_mutagen(path)
+    frames = [
+        frame(frame_id, payload, version=4)
+        for frame_id, payload in [("TPE1", b"\x03Jane Doe"), ("TALB", b"\x03Le Livre")]
+    ]
+    extended = syncsafe(6) + b"\x01\x00"
+    path = write_tag(
+        tmp_path / "v24.mp3", frames, version=4, flags=0x40, extended=extended
+    )
+    assert_matches_mutagen(path)
+
+
+def test_v24_frame_flags(tmp_path):
+    text = "\xffre".encode("latin-1")
+    unsynced = b"\x00" + text.replace(b"\xff", b"\xff\x00")
+    # data length indicator + per-frame / tag-wide unsynchronisation
+    payload = syncsafe(len(text) + 1) + unsynced
+    for name, frame_flags, flags in [("frame", 0x0003, 0), ("tag", 0x0001, 0x80)]:
+        frames = [
+            frame("TPE1", payload, version=4, flags=frame_flags),
+            frame("TALB", b"\x03Le Livre", version=4),
+        ]
+        path = write_tag(tmp_path / f"{name}.mp3", frames, version=4, flags=flags)
+        assert_matches_mutagen(path)
+        assert read_text_frames(path, ("TPE1",)).tags == {"TPE1": "\xffre"}
+    # group identifier (which mutagen doesn't handle, so compare to literal)
+    frames = [frame("TPE1", b"\x01" + payload, version=4, flags=0x0043)]
+    path = write_tag(tmp_path / "group.mp3", frames, version=4)
+    assert read_text_frames(path, ("TPE1",)).tags == {"TPE1": "\xffre"}
+
+
+def test_undecodable_frames(tmp_path):
+    for name, payload in [("empty", b""), ("encoding", b"\x07Jane Doe")]:
+        frames = [frame("TPE1", payload), frame("TALB", b"\x00Le Livre")]
+        path = write_tag(tmp_path / f"{name}.mp3", frames)
+        assert_matches_mutagen(path)
+        assert get_artist(path) == get_artist(mutagen.File(path)) == "None"
+
+
+def test_repeated_frames(tmp_path):
+    frames = [
+        frame("TPE1", b"\x00Jane"),
+        frame("TALB", b"\x00Le Livre"),
+        frame("TPE1", b"\x03John"),
+    ]
+    path = write_tag(tmp_path / "repeated.mp3", frames)
+    assert_matches_mutagen(path)
+    assert read_text_frames(path, ("TPE1",)).tags == {"TPE1": "Jane\x00John"}
+
+
+def test_fallbacks(tmp_path):
+    frames = [frame("TPE1", b"\x00Jane Doe"), frame("TALB", b"\x00Le Livre")]
+    # tag-wide unsynchronisation
+    assert_falls_back(write_tag(tmp_path / "unsync.mp3", frames, flags=0x80))
+    # compressed frame
+    compressed = frame("TPE1", b"\x00\x00\x00\x09" + b"x\x9c", flags=0x0080)
+    assert_falls_back(write_tag(tmp_path / "zlib.mp3", [compressed] + frames[1:]))
+    # ID3v1 tag supplying the artist that the ID3v2 tag lacks
+    v1 = b"TAG" + b"Title".ljust(30, b"\x00") + b"V1 Artist".ljust(30, b"\x00")
+    v1 += b"V1 Album".ljust(30, b"\x00") + b"2020" + b"\x00" * 30 + b"\xff"
+    path = write_tag(tmp_path / "v1.mp3", frames[1:], v1=v1)
+    assert_falls_back(path)
+    assert get_artist(path) == "V1 Artist"
@@ -0,0 +1,157 @@
+import json
+import os
+
+from click.testing import CliRunner
+from mutagen.id3 import ID3, TALB, TPE1, TRCK
+import pytest
+
+from booktool.__main__ import cli
+from booktool.audio.track import ConflictError
+from booktool.shard import Shard, merge_reports, new_report
+
+keys = [(f"Author {i}", f"Title {j}") for i in range(20) for j in range(5)]
+
+
+def test_from_string():
+    assert Shard.from_string("2/3") == (2, 3)
+    assert str(Shard.from_string("2/3")) == "2/3"
+    for string in ["0/3", "4/3", "3", "a/b"]:
+        with pytest.raises(ValueError):
+            Shard.from_string(string)
+
+
+def test_contains():
+    shards = [Shard(index, 4) for index in range(1, 5)]
+    for key in keys:
+        assert sum(shard.contains(key) for shard in shards) == 1
+    # every shard gets some of the work
+    assert all(any(shard.contains(key) for key in keys) for shard in shards)
+    assert all(Shard().contains(key) for key in keys)
+
+
+def test_merge_reports():
+    first, second = new_report(Shard(1, 2)), new_report(Shard(2, 2))
+    first["duration"], second["duration"] = 1.5, 2.5
+    first["moves"].append(["a.mp3", "A/01.mp3"])
+    second["conflicts"].append(["b.mp3", "Cannot merge with conflicts"])
+    merged = merge_reports([first, second])
+    assert merged == {
+        "shards": ["1/2", "2/2"],
+        "duration": 4.0,
+        "moves": [["a.mp3", "A/01.mp3"]],
+        "conflicts": [["b.mp3", "Cannot merge with conflicts"]],
+    }
+
+
+def test_merge_reports_missing(caplog):
+    merge_reports([new_report(Shard(1, 3))])
+    assert "Missing reports for shards [2, 3] of 3" in caplog.text
+
+
+def test_merge_reports_without_duration():
+    merged = merge_reports([new_report(Shard(1, 2)), new_report(Shard(2, 2))])
+    assert "duration" not in merged
+
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz frame (417 bytes) of silence
+MPEG_FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+
+
+def write_library(root, groups=8, tracks=2):
+    """
+    Write `groups` albums of `tracks` MP3s each, with increasing lengths.
+    """
+    for i in range(groups):
+        directory = root / f"album{i}"
+        directory.mkdir(parents=True)
+        for j in range(1, tracks + 1):
+            path = str(directory / f"{j}.mp3")
+            with open(path, "wb") as fp:
+                fp.write(MPEG_FRAME * (20 + 10 * i + j))
+            tags = ID3()
+            tags.add(TPE1(encoding=3, text=f"Author {i}"))
+            tags.add(TALB(encoding=3, text=f"Title {i}"))
+            tags.add(TRCK(encoding=0, text=f"{j}/{tracks}"))
+            tags.save(path)
+
+
+def test_cli_shard_option(tmp_path):
+    result = CliRunner().invoke(cli, ["duration", "--shard", "0/3", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "Shard index must be in 1...3" in result.output
+
+
+def test_cli_duration(tmp_path):
+    write_library(tmp_path / "library")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["duration", str(tmp_path / "library")])
+    assert result.exit_code == 0, result.output
+    reports = []
+    for index in range(1, 4):
+        report = str(tmp_path / f"{index}.json")
+        args = ["duration", "--shard", f"{index}/3", "--report", report]
+        shard_result = runner.invoke(cli, args + [str(tmp_path / "library")])
+        assert shard_result.exit_code == 0, shard_result.output
+        reports.append(report)
+    merged = runner.invoke(cli, ["merge-reports"] + reports)
+    assert merged.exit_code == 0, merged.output
+    assert round(json.loads(merged.output)["duration"]) == int(result.output)
+
+
+def test_cli_duration_untagged(tmp_path):
+    write_library(tmp_path / "library", groups=2)
+    (tmp_path / "library" / "untagged").mkdir()
+    (tmp_path / "library" / "untagged" / "1.mp3").write_bytes(MPEG_FRAME * 40)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["duration", str(tmp_path / "library")])
+    assert result.exit_code == 0, result.output
+    total = 0.0
+    for index in range(1, 3):
+        report = str(tmp_path / f"{index}.json")
+        args = ["duration", "--shard", f"{index}/2", "--report", report]
+        shard_result = runner.invoke(cli, args + [str(tmp_path / "library")])
+        assert shard_result.exit_code == 0, shard_result.output
+        with open(report) as fp:
+            total += json.load(fp)["duration"]
+    assert round(total) == int(result.output)
+
+
+def test_cli_canonicalize(tmp_path):
+    write_library(tmp_path / "library")
+    (tmp_path / "output").mkdir()
+    runner = CliRunner()
+    args = ["canonicalize", "-n", "-d", str(tmp_path / "output")]
+    shard_albums = []
+    for index in range(1, 4):
+        report = str(tmp_path / f"{index}.json")
+        shard_args = ["--shard", f"{index}/3", "--report", report]
+        result = runner.invoke(cli, args + shard_args + [str(tmp_path / "library")])
+        assert result.exit_code == 0, result.output
+        with open(report) as fp:
+            moves = json.load(fp)["moves"]
+        shard_albums.append({os.path.basename(source) for source, _ in moves})
+    # each album directory is moved as a whole, by exactly one shard
+    assert sum(map(len, shard_albums)) == 8
+    assert set.union(*shard_albums) == {f"album{i}" for i in range(8)}
+
+
+def test_cli_canonicalize_conflicts(tmp_path):
+    write_library(tmp_path / "library", groups=1)
+    # named as track 3 of 2, but tagged as 1/2
+    (tmp_path / "library" / "album0" / "1.mp3").rename(
+        tmp_path / "library" / "album0" / "3.mp3"
+    )
+    (tmp_path / "output").mkdir()
+    runner = CliRunner()
+    args = ["canonicalize", "-n", "-d", str(tmp_path / "output")]
+    result = runner.invoke(cli, args + [str(tmp_path / "library")])
+    assert isinstance(result.exception, ConflictError)
+    report = str(tmp_path / "report.json")
+    result = runner.invoke(cli, args + ["-r", report, str(tmp_path / "library")])
+    assert isinstance(result.exception, ConflictError)
+    args += ["--skip-conflicts", "-r", report]
+    result = runner.invoke(cli, args + [str(tmp_path / "library")])
+    assert result.exit_code == 0, result.output
+    with open(report) as fp:
+        (conflict,) = json.load(fp)["conflicts"]
+    assert conflict[0].endswith("3.mp3")